@@ -9,8 +9,22 @@ Run with: python app.py
 Access at: http://localhost:5000
 """
 
+import eventlet
+
+# Monkey-patch the standard library before anything else is imported so that
+# sockets, threading, and time become greenlet-aware. This must happen before
+# Flask (and anything that imports socket) is loaded.
+eventlet.monkey_patch()
+
+import logging
+import logging.handlers
 import os
-from flask import Flask, render_template
+import queue
+import sys
+import time
+
+import orjson
+from flask import Flask, render_template, request
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
 from config import get_config, DevelopmentConfig
@@ -23,6 +37,35 @@ from services.game_logic import (
 from services.word_bank import get_words_for_selection
 
 
+# Application logger. Handlers run on the event loop, so stdout writes are
+# pushed through a queue and flushed by a background listener thread - the
+# emitting handler returns immediately instead of blocking on a flush.
+log = logging.getLogger('quiet_game')
+
+
+def _configure_logging(app: Flask) -> None:
+    """
+    Configure queue-based logging for the application.
+
+    Debug-level records are dropped entirely in production, so hot-path
+    log.debug() calls cost a single level check and nothing more.
+
+    Args:
+        app: Flask application instance.
+    """
+    if log.handlers:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(logging.DEBUG if app.debug else logging.WARNING)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, logging.StreamHandler()
+    )
+    listener.start()
+
+
 # =============================================================================
 # Application Factory
 # =============================================================================
@@ -63,7 +106,10 @@ def create_app(config_name: str = 'development') -> Flask:
     
     # Register main routes
     register_main_routes(app)
-    
+
+    # Configure logging
+    _configure_logging(app)
+
     return app
 
 
@@ -95,11 +141,31 @@ def register_main_routes(app: Flask) -> None:
 # Create Application and SocketIO
 # =============================================================================
 
-app = create_app('development')
+class _OrjsonCodec:
+    """
+    JSON codec adapter so SocketIO packets are (de)serialized with orjson.
+
+    orjson is a C extension and roughly 5x faster than stdlib json at
+    encoding the dict payloads we broadcast, so each packet is built once
+    and cheaply instead of re-walking the dict in pure Python.
+    """
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(data, *args, **kwargs):
+        return orjson.loads(data)
+
+
+app = create_app(os.environ.get('FLASK_ENV', 'development'))
 socketio = SocketIO(
     app,
     cors_allowed_origins="*",
-    async_mode='threading'
+    async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+    message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'],
+    json=_OrjsonCodec
 )
 
 
@@ -107,21 +173,150 @@ socketio = SocketIO(
 # SocketIO Event Handlers for Real-time Communication
 # =============================================================================
 
-# Store connected users per room
-connected_users: dict = {}
+# Per-socket metadata keyed by session ID. Room membership itself is
+# already tracked by the SocketIO manager (socketio.server.manager.rooms),
+# so we only keep what the manager doesn't: who the socket belongs to.
+user_meta: dict = {}
+
+# Map user IDs to their SocketIO session IDs so that private payloads
+# (e.g. the secret word) can be sent to a single socket instead of the room
+sid_by_user: dict = {}
+
+
+def _norm_room(code: str) -> str:
+    """
+    Normalize a room code coming from user input.
+
+    Game handlers receive codes typed into URL bars and forms, so they are
+    uppercased here once; interning means every event for the same room
+    shares one string object instead of allocating a fresh copy per event.
+
+    Args:
+        code: The raw room code from the client.
+
+    Returns:
+        The canonical uppercase room code, or '' if empty.
+    """
+    if not code:
+        return ''
+    return sys.intern(code.upper())
+
+
+def batched_emit(event: str, data: dict, room: str,
+                 batch_size: int = 50, skip_sid: str = None) -> None:
+    """
+    Broadcast an event to a room in batches, yielding between batches.
+
+    A plain emit(room=...) serializes and sends to every socket in one
+    synchronous pass, which stalls the worker in large rooms. Chunking the
+    recipients and calling socketio.sleep(0) between chunks lets incoming
+    events (guesses, ICE candidates) interleave with the broadcast.
+
+    Args:
+        event: The event name to emit.
+        data: The event payload.
+        room: The room to broadcast to.
+        batch_size: Number of sockets to send to between yields.
+        skip_sid: Optional session ID to exclude (e.g. the sender).
+    """
+    # The local room manager only knows sids connected to this worker.
+    # With a message queue configured (multi-worker mode), room members
+    # may live on other workers, so fall back to a plain room emit and
+    # let the queue fan it out everywhere.
+    if app.config['SOCKETIO_MESSAGE_QUEUE']:
+        socketio.emit(event, data, room=room, skip_sid=skip_sid)
+        return
+
+    participants = socketio.server.manager.rooms.get('/', {}).get(room)
+    if not participants:
+        return
+
+    sids = [sid for sid in participants if sid != skip_sid]
+    for start in range(0, len(sids), batch_size):
+        for sid in sids[start:start + batch_size]:
+            socketio.server.emit(event, data, to=sid, namespace='/')
+        socketio.sleep(0)
 
 
 @socketio.on('connect')
 def handle_connect():
     """Handle new WebSocket connection."""
-    print(f"Client connected")
+    log.debug("Client connected")
     emit('connected', {'status': 'connected'})
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    """Handle WebSocket disconnection."""
-    print("Client disconnected")
+    """
+    Handle WebSocket disconnection.
+
+    A closed tab never sends leave-game, so without this cleanup the
+    player would stay in the game forever - blocking all_players_ready,
+    keeping empty rooms alive, and inflating every broadcast.
+    """
+    meta = user_meta.pop(request.sid, None)
+    # Only the user's current socket may remove them: on a refresh the
+    # client rejoins with a new sid before the dead socket's disconnect
+    # fires (the ping timeout can lag by a minute), and that stale
+    # disconnect must not evict the reconnected player or clobber the
+    # mapping that now points at the new socket.
+    if meta and sid_by_user.get(meta['userId']) == request.sid:
+        sid_by_user.pop(meta['userId'], None)
+        _remove_player_from_game(meta['roomCode'], meta['userId'])
+    _guess_buckets.pop(request.sid, None)
+    log.debug("Client disconnected")
+
+
+def _send_word_choices(room_code: str, actor_id: str,
+                       word_choices: list) -> None:
+    """
+    Deliver word choices to the round's actor.
+
+    Prefers the actor's own socket so guessers never receive the
+    candidates. If no socket is mapped for the actor (e.g. mid-reconnect),
+    the round must not stall silently: log it and fall back to the room
+    broadcast - handleWordChoices ignores the event on non-actor clients.
+
+    Args:
+        room_code: The actor's room.
+        actor_id: The current actor's user ID.
+        word_choices: Candidate words for the round.
+    """
+    payload = {'words': word_choices}
+    actor_sid = sid_by_user.get(actor_id)
+    if actor_sid:
+        emit('word-choices', payload, to=actor_sid)
+    else:
+        log.warning("No socket mapped for actor %s in room %s; "
+                    "broadcasting word choices to the room",
+                    actor_id, room_code)
+        emit('word-choices', payload, room=room_code)
+
+
+def _remove_player_from_game(room_code: str, user_id: str) -> None:
+    """
+    Remove a player from their game, dropping the game if it empties.
+
+    Shared by leave-game and disconnect so both paths keep game state
+    and broadcast fanout consistent.
+
+    Args:
+        room_code: The room the player was in.
+        user_id: The leaving player's user ID.
+    """
+    game = get_game(room_code)
+    if not game:
+        return
+
+    game.remove_player(user_id)
+
+    if len(game.players) == 0:
+        remove_game(room_code)
+    else:
+        emit('player-left', {
+            'userId': user_id,
+            'gameState': game.get_game_state()
+        }, room=room_code)
 
 
 # =============================================================================
@@ -134,7 +329,7 @@ def handle_join_game(data: dict):
     Handle user joining a game room.
     Supports joining mid-game - player will be added and synced with current round.
     """
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     user_id = data.get('userId', '')
     username = data.get('username', f'Player_{user_id[-4:]}')
     
@@ -144,15 +339,14 @@ def handle_join_game(data: dict):
     
     # Join the SocketIO room
     join_room(room_code)
-    
+
     # Track connected user
-    if room_code not in connected_users:
-        connected_users[room_code] = {}
-    
-    connected_users[room_code][user_id] = {
+    user_meta[request.sid] = {
         'username': username,
-        'userId': user_id
+        'userId': user_id,
+        'roomCode': room_code
     }
+    sid_by_user[user_id] = request.sid
     
     # Get or create game
     game = get_game(room_code)
@@ -164,57 +358,44 @@ def handle_join_game(data: dict):
     
     # Check if game is already in progress (mid-game join)
     is_mid_game_join = game.game_started and not game.game_ended
-    
-    # Send current game state to the new player
+
+    # Send the full state only to the joining socket
     game_state = game.get_game_state()
-    game_state['is_mid_game_join'] = is_mid_game_join
-    emit('game-state', game_state)
-    
-    # Notify others that a new user joined
-    emit('player-joined', {
+    emit('game-state', dict(game_state, is_mid_game_join=is_mid_game_join))
+
+    # Notify others with just the delta - existing clients already hold the
+    # full state and merge the new player into their local roster
+    batched_emit('player-joined', {
         'userId': user_id,
         'username': username,
-        'gameState': game.get_game_state(),
         'isMidGameJoin': is_mid_game_join
-    }, room=room_code, include_self=False)
+    }, room_code, skip_sid=request.sid)
     
     join_type = "mid-game" if is_mid_game_join else "lobby"
-    print(f"User {username} joined game {room_code} ({join_type}). Total players: {len(game.players)}")
+    log.debug("User %s joined game %s (%s). Total players: %d",
+              username, room_code, join_type, len(game.players))
 
 
 @socketio.on('leave-game')
 def handle_leave_game(data: dict):
     """Handle user leaving a game room."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     user_id = data.get('userId', '')
     
     if room_code and user_id:
         leave_room(room_code)
+        _remove_player_from_game(room_code, user_id)
+
+        user_meta.pop(request.sid, None)
+        sid_by_user.pop(user_id, None)
         
-        game = get_game(room_code)
-        if game:
-            game.remove_player(user_id)
-            
-            if len(game.players) == 0:
-                remove_game(room_code)
-            else:
-                emit('player-left', {
-                    'userId': user_id,
-                    'gameState': game.get_game_state()
-                }, room=room_code)
-        
-        if room_code in connected_users and user_id in connected_users[room_code]:
-            del connected_users[room_code][user_id]
-            if not connected_users[room_code]:
-                del connected_users[room_code]
-        
-        print(f"User {user_id} left game {room_code}")
+        log.debug("User %s left game %s", user_id, room_code)
 
 
 @socketio.on('player-ready')
 def handle_player_ready(data: dict):
     """Handle player ready status."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     user_id = data.get('userId', '')
     is_ready = data.get('isReady', True)
     
@@ -233,7 +414,7 @@ def handle_player_ready(data: dict):
 @socketio.on('start-game')
 def handle_start_game(data: dict):
     """Handle game start request."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     difficulty = data.get('difficulty', 'easy')
     
     game = get_game(room_code)
@@ -256,19 +437,16 @@ def handle_start_game(data: dict):
         'gameState': game.get_game_state(),
         'actorId': actor_id
     }, room=room_code)
-    
-    # Send word choices only to the actor
-    emit('word-choices', {
-        'words': word_choices
-    }, room=room_code)  # Will filter client-side
-    
-    print(f"Game started in room {room_code}")
+
+    _send_word_choices(room_code, actor_id, word_choices)
+
+    log.debug("Game started in room %s", room_code)
 
 
 @socketio.on('select-word')
 def handle_select_word(data: dict):
     """Handle actor selecting a word."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     user_id = data.get('userId', '')
     word_data = data.get('word', {})
     
@@ -293,24 +471,59 @@ def handle_select_word(data: dict):
         'difficulty': word_data.get('difficulty', 'easy')
     }, room=room_code)
     
-    # Send the actual word only to the actor
+    # Send the actual word only to the actor (the sender of this event)
     emit('your-word', {
         'word': word_data['word'],
         'category': word_data['category']
-    }, room=room_code)  # Will filter client-side
+    })
     
-    print(f"Round {game.current_round.round_number} started in {room_code}: {word_data['word']}")
+    log.debug("Round %d started in %s: %s",
+              game.current_round.round_number, room_code, word_data['word'])
+
+
+# Token buckets for guess rate limiting, keyed by session ID.
+# Each entry is (last_refill_time, tokens). Refill rate 2/s, burst of 5.
+_guess_buckets: dict = {}
+_GUESS_BUCKET_SIZE: float = 5.0
+_GUESS_REFILL_RATE: float = 2.0
+
+
+def _allow_guess(sid: str) -> bool:
+    """
+    Check and debit the guess token bucket for a socket.
+
+    A flooding client can otherwise fan out a room broadcast per
+    keystroke, starving video signaling. Sustained rate is 2 guesses per
+    second with a burst of 5.
+
+    Args:
+        sid: The SocketIO session ID of the guesser.
+
+    Returns:
+        True if the guess may proceed.
+    """
+    now = time.monotonic()
+    last, tokens = _guess_buckets.get(sid, (now, _GUESS_BUCKET_SIZE))
+    tokens = min(_GUESS_BUCKET_SIZE, tokens + (now - last) * _GUESS_REFILL_RATE)
+    if tokens < 1.0:
+        _guess_buckets[sid] = (now, tokens)
+        return False
+    _guess_buckets[sid] = (now, tokens - 1.0)
+    return True
 
 
 @socketio.on('submit-guess')
 def handle_submit_guess(data: dict):
     """Handle a player's guess."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     user_id = data.get('userId', '')
     guess = data.get('guess', '').strip()
-    
+
     if not guess:
         return
+
+    if not _allow_guess(request.sid):
+        return
     
     game = get_game(room_code)
     if not game or not game.current_round:
@@ -319,12 +532,14 @@ def handle_submit_guess(data: dict):
     result = game.submit_guess(user_id, guess)
     username = game.players[user_id].username if user_id in game.players else 'Unknown'
     
-    # Broadcast the guess to everyone (but not if correct - that reveals the answer)
+    # Broadcast the guess to everyone (but not if correct - that reveals the
+    # answer). Single-letter keys: this is the chattiest game event and the
+    # key names dominate the uncompressed frame size.
     if not result['correct']:
         emit('guess-made', {
-            'userId': user_id,
-            'username': username,
-            'guess': guess
+            'u': user_id,
+            'n': username,
+            'g': guess
         }, room=room_code)
     else:
         # Correct guess!
@@ -335,19 +550,17 @@ def handle_submit_guess(data: dict):
             'leaderboard': game.get_leaderboard()
         }, room=room_code)
         
-        # Check if everyone has guessed correctly
-        guessers = [p for p in game.players.values() 
-                   if p.user_id != game.current_round.actor_id]
-        all_guessed = all(p.has_guessed_correctly for p in guessers)
-        
-        if all_guessed:
+        # Check if everyone has guessed correctly. The round records each
+        # correct guesser exactly once, so comparing the count against the
+        # number of non-actor players is O(1) instead of scanning players.
+        if len(game.current_round.correct_guessers) >= len(game.players) - 1:
             end_current_round(room_code)
 
 
 @socketio.on('request-hint')
 def handle_request_hint(data: dict):
     """Handle hint request."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     
     game = get_game(room_code)
     if game and game.current_round:
@@ -359,7 +572,7 @@ def handle_request_hint(data: dict):
 @socketio.on('time-up')
 def handle_time_up(data: dict):
     """Handle round time expiration."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     end_current_round(room_code)
 
 
@@ -372,33 +585,34 @@ def end_current_round(room_code: str):
     word = game.current_round.word
     round_summary = game.end_round()
     
-    emit('round-ended', {
+    batched_emit('round-ended', {
         'word': word,
         'summary': round_summary,
         'gameState': game.get_game_state(),
         'gameEnded': game.game_ended
-    }, room=room_code)
-    
+    }, room_code)
+
     if game.game_ended:
-        emit('game-over', {
+        batched_emit('game-over', {
             'results': game.get_final_results()
-        }, room=room_code)
+        }, room_code)
     else:
         # Send word choices for next round
         word_choices = get_words_for_selection(game.difficulty, 3)
         actor_id = game.get_current_actor()
-        
-        emit('next-round', {
+
+        batched_emit('next-round', {
             'actorId': actor_id,
-            'words': word_choices,
             'gameState': game.get_game_state()
-        }, room=room_code)
+        }, room_code)
+
+        _send_word_choices(room_code, actor_id, word_choices)
 
 
 @socketio.on('chat-message')
 def handle_chat_message(data: dict):
     """Handle chat messages (non-guess messages)."""
-    room_code = data.get('roomCode', '').upper()
+    room_code = _norm_room(data.get('roomCode', ''))
     user_id = data.get('userId', '')
     message = data.get('message', '').strip()
     
@@ -410,36 +624,63 @@ def handle_chat_message(data: dict):
     if game and user_id in game.players:
         username = game.players[user_id].username
     
-    emit('chat-message', {
+    batched_emit('chat-message', {
         'userId': user_id,
         'username': username,
         'message': message
-    }, room=room_code)
+    }, room_code)
 
 
 # =============================================================================
 # WebRTC Signaling Handlers (for video)
 # =============================================================================
 
+def _emit_signal(event: str, payload: dict, room_code: str,
+                 target_id: str) -> None:
+    """
+    Deliver a WebRTC signaling event to its intended peer.
+
+    Offers, answers, and ICE candidates are always addressed to one peer;
+    broadcasting them to the room costs O(players) sends per candidate
+    that everyone but the target discards. When the target's socket is
+    known the event goes only to it; otherwise fall back to the room
+    broadcast (skipping the sender) so signaling still works for clients
+    that omit targetId.
+
+    Args:
+        event: The signaling event name.
+        payload: The event payload.
+        room_code: The room the peers are in.
+        target_id: The user ID of the intended recipient, if any.
+    """
+    target_sid = sid_by_user.get(target_id) if target_id else None
+    if target_sid:
+        socketio.server.emit(event, payload, to=target_sid, namespace='/')
+    else:
+        # skip_sid on the server emit avoids the per-recipient Flask
+        # context lookup that include_self=False performs
+        socketio.server.emit(event, payload, room=room_code,
+                             skip_sid=request.sid, namespace='/')
+
 @socketio.on('offer')
 def handle_offer(data: dict):
     """Handle WebRTC offer for peer connection."""
     if not data or not isinstance(data, dict):
         return
     
-    room_code = (data.get('roomCode') or '').upper()
+    room_code = data.get('roomCode')
     offer = data.get('offer')
     user_id = data.get('userId')
     target_id = data.get('targetId')
     
-    if not all([room_code, offer, user_id]):
+    if not room_code or not offer or not user_id:
         return
     
-    emit('offer', {
+    _emit_signal('offer', {
         'offer': offer,
         'userId': user_id,
         'targetId': target_id
-    }, room=room_code, include_self=False)
+    }, room_code, target_id)
 
 
 @socketio.on('answer')
@@ -448,19 +689,19 @@ def handle_answer(data: dict):
     if not data or not isinstance(data, dict):
         return
     
-    room_code = (data.get('roomCode') or '').upper()
+    room_code = data.get('roomCode')
     answer = data.get('answer')
     user_id = data.get('userId')
     target_id = data.get('targetId')
     
-    if not all([room_code, answer, user_id]):
+    if not room_code or not answer or not user_id:
         return
     
-    emit('answer', {
+    _emit_signal('answer', {
         'answer': answer,
         'userId': user_id,
         'targetId': target_id
-    }, room=room_code, include_self=False)
+    }, room_code, target_id)
 
 
 @socketio.on('ice-candidate')
@@ -469,7 +710,7 @@ def handle_ice_candidate(data: dict):
     if not data or not isinstance(data, dict):
         return
     
-    room_code = (data.get('roomCode') or '').upper()
+    room_code = data.get('roomCode')
     candidate = data.get('candidate')
     user_id = data.get('userId')
     target_id = data.get('targetId')
@@ -477,15 +718,17 @@ def handle_ice_candidate(data: dict):
     if not room_code or not candidate:
         return
     
-    emit('ice-candidate', {
-        'candidate': candidate,
-        'userId': user_id,
-        'targetId': target_id
-    }, room=room_code, include_self=False)
+    # Single-letter keys: candidates stream at high rate during call setup
+    # and small frames are not compressed, so key length is real bandwidth
+    _emit_signal('ice-candidate', {
+        'c': candidate,
+        'u': user_id,
+        't': target_id
+    }, room_code, target_id)
 
 
 # =============================================================================
-# Application Entry Point
+# Application Entry Point (development only - see wsgi.py for production)
 # =============================================================================
 
 if __name__ == '__main__':
@@ -506,5 +749,5 @@ if __name__ == '__main__':
         app,
         host='0.0.0.0',
         port=5000,
-        debug=True
+        debug=app.debug
     )
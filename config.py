@@ -27,7 +27,15 @@ class Config:
     SESSION_CODE_CHARACTERS: str = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'  # Excluded I, O, 0, 1 for clarity
     
     # SocketIO Settings
-    SOCKETIO_ASYNC_MODE: str = 'threading'
+    # Eventlet's greenlet-based cooperative multitasking keeps thousands of
+    # idle WebSockets on a single OS thread instead of one thread per socket.
+    SOCKETIO_ASYNC_MODE: str = 'eventlet'
+
+    # Optional Redis pub/sub queue for multi-worker deployments. When set
+    # (e.g. 'redis://localhost:6379/0'), room broadcasts reach clients on
+    # every worker instead of only the one handling the emitting socket.
+    # Game state itself stays in-process, so workers need sticky sessions.
+    SOCKETIO_MESSAGE_QUEUE: str = os.environ.get('REDIS_URL')
     
     # WebRTC Settings
     ICE_SERVERS: list = [
@@ -10,7 +10,9 @@ from models.session import (
     create_session,
     get_session_by_code,
     create_guess,
+    create_guesses,
     get_guesses_for_session,
+    iter_guesses,
     create_video_call,
     get_video_call_by_room,
     update_video_call_mood,
@@ -24,7 +26,9 @@ __all__ = [
     'create_session',
     'get_session_by_code',
     'create_guess',
+    'create_guesses',
     'get_guesses_for_session',
+    'iter_guesses',
     'create_video_call',
     'get_video_call_by_room',
     'update_video_call_mood',
@@ -5,12 +5,17 @@ This module contains functions for CRUD operations on sessions, guesses,
 and video calls. All functions use proper error handling and type hints.
 """
 
-import json
-import random
-import string
+import atexit
+import os
+import queue
+import re
 import sqlite3
-from datetime import datetime
-from typing import Optional, Dict, List, Any
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Any, Tuple
+
+import orjson
 
 from models.database import db_transaction, get_db_connection, close_db_connection
 
@@ -19,38 +24,93 @@ from models.database import db_transaction, get_db_connection, close_db_connecti
 SESSION_CODE_LENGTH: int = 6
 SESSION_CODE_CHARS: str = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
 
+# The 32-character alphabet maps exactly onto 5 bits, so each random byte
+# masked with 31 picks a character with uniform probability.
+_ALPHA: bytes = SESSION_CODE_CHARS.encode('ascii')
+
 
 def generate_session_code() -> str:
     """
     Generate a unique 6-character alphanumeric session code.
-    
+
     Uses characters that are visually distinct (excludes I, O, 0, 1)
-    to prevent user confusion when sharing codes.
-    
+    to prevent user confusion when sharing codes. Codes are drawn from
+    os.urandom, so they are cryptographically strong and cannot be
+    predicted to guess other users' codes.
+
     Returns:
         A unique 6-character uppercase alphanumeric code.
     """
-    return ''.join(random.choices(SESSION_CODE_CHARS, k=SESSION_CODE_LENGTH))
+    raw = os.urandom(SESSION_CODE_LENGTH)
+    return bytes(_ALPHA[b & 31] for b in raw).decode('ascii')
 
 
 def generate_room_code() -> str:
     """
     Generate a unique room code for video calls.
-    
-    Format: XXXX-XXXX for easy sharing and readability.
-    
+
+    Format: XXXX-XXXX for easy sharing and readability. Drawn from
+    os.urandom like session codes.
+
     Returns:
         An 8-character room code with hyphen separator.
     """
-    part1 = ''.join(random.choices(SESSION_CODE_CHARS, k=4))
-    part2 = ''.join(random.choices(SESSION_CODE_CHARS, k=4))
-    return f"{part1}-{part2}"
+    raw = os.urandom(8)
+    body = bytes(_ALPHA[b & 31] for b in raw)
+    return f"{body[:4].decode('ascii')}-{body[4:].decode('ascii')}"
+
+
+def _find_unused_code(table: str, column: str, generator) -> str:
+    """
+    Generate a code that does not yet exist in the given table.
+
+    The probe runs on a plain read connection before any write transaction
+    is opened, so collisions never hold a transaction while retrying.
+
+    Args:
+        table: Table to check for collisions.
+        column: Column holding the code.
+        generator: Zero-argument callable producing candidate codes.
+
+    Returns:
+        A code not currently present in the table.
+
+    Raises:
+        sqlite3.Error: If no free code is found after several attempts.
+    """
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        for _ in range(5):
+            code = generator()
+            cursor.execute(
+                f"SELECT 1 FROM {table} WHERE {column} = ?", (code,)
+            )
+            if cursor.fetchone() is None:
+                return code
+        raise sqlite3.Error(f"Failed to generate unique {column}")
+    finally:
+        close_db_connection(connection)
 
 
 # =============================================================================
 # Session Operations (Feature 1: Encoder)
 # =============================================================================
 
+# SQL hoisted to module constants: identical text on every call lets the
+# connection's statement cache skip re-parsing and re-planning the query.
+_SQL_GET_SESSION_BY_CODE: str = """
+    SELECT id, session_code, emotion, pattern_config, created_at
+    FROM sessions
+    WHERE session_code = ?
+"""
+
+_SQL_GET_SESSION_BY_ID: str = """
+    SELECT id, session_code, emotion, pattern_config, created_at
+    FROM sessions
+    WHERE id = ?
+"""
+
 def create_session(emotion: str, pattern_config: Dict[str, Any]) -> Dict[str, Any]:
     """
     Create a new emotion encoding session.
@@ -72,31 +132,29 @@ def create_session(emotion: str, pattern_config: Dict[str, Any]) -> Dict[str, An
     if not pattern_config or not isinstance(pattern_config, dict):
         raise ValueError("Pattern config must be a non-empty dictionary")
     
-    session_code = generate_session_code()
-    pattern_json = json.dumps(pattern_config)
-    
-    with db_transaction() as connection:
-        cursor = connection.cursor()
-        
-        # Ensure unique session code (retry if collision)
-        max_retries = 5
-        for attempt in range(max_retries):
-            try:
+    pattern_blob = orjson.dumps(pattern_config)
+
+    # The probe runs outside the write transaction, so a concurrent
+    # worker can claim the code between probe and insert; the UNIQUE
+    # constraint catches that, and one retry with a fresh code covers it
+    for attempt in range(2):
+        session_code = _find_unused_code('sessions', 'session_code',
+                                         generate_session_code)
+        try:
+            with db_transaction() as connection:
+                cursor = connection.cursor()
                 cursor.execute(
                     """
                     INSERT INTO sessions (session_code, emotion, pattern_config)
                     VALUES (?, ?, ?)
                     """,
-                    (session_code, emotion.lower(), pattern_json)
+                    (session_code, emotion.lower(), pattern_blob)
                 )
-                break
-            except sqlite3.IntegrityError:
-                if attempt < max_retries - 1:
-                    session_code = generate_session_code()
-                else:
-                    raise sqlite3.Error("Failed to generate unique session code")
-        
-        session_id = cursor.lastrowid
+                session_id = cursor.lastrowid
+            break
+        except sqlite3.IntegrityError:
+            if attempt:
+                raise
     
     return {
         'id': session_id,
@@ -123,14 +181,7 @@ def get_session_by_code(session_code: str) -> Optional[Dict[str, Any]]:
     connection = get_db_connection()
     try:
         cursor = connection.cursor()
-        cursor.execute(
-            """
-            SELECT id, session_code, emotion, pattern_config, created_at
-            FROM sessions
-            WHERE session_code = ?
-            """,
-            (session_code.upper(),)
-        )
+        cursor.execute(_SQL_GET_SESSION_BY_CODE, (session_code.upper(),))
         row = cursor.fetchone()
         
         if row:
@@ -138,7 +189,7 @@ def get_session_by_code(session_code: str) -> Optional[Dict[str, Any]]:
                 'id': row['id'],
                 'session_code': row['session_code'],
                 'emotion': row['emotion'],
-                'pattern_config': json.loads(row['pattern_config']),
+                'pattern_config': orjson.loads(row['pattern_config']),
                 'created_at': row['created_at']
             }
         return None
@@ -159,14 +210,7 @@ def get_session_by_id(session_id: int) -> Optional[Dict[str, Any]]:
     connection = get_db_connection()
     try:
         cursor = connection.cursor()
-        cursor.execute(
-            """
-            SELECT id, session_code, emotion, pattern_config, created_at
-            FROM sessions
-            WHERE id = ?
-            """,
-            (session_id,)
-        )
+        cursor.execute(_SQL_GET_SESSION_BY_ID, (session_id,))
         row = cursor.fetchone()
         
         if row:
@@ -174,7 +218,7 @@ def get_session_by_id(session_id: int) -> Optional[Dict[str, Any]]:
                 'id': row['id'],
                 'session_code': row['session_code'],
                 'emotion': row['emotion'],
-                'pattern_config': json.loads(row['pattern_config']),
+                'pattern_config': orjson.loads(row['pattern_config']),
                 'created_at': row['created_at']
             }
         return None
@@ -186,6 +230,18 @@ def get_session_by_id(session_id: int) -> Optional[Dict[str, Any]]:
 # Guess Operations (Feature 2: Decoder)
 # =============================================================================
 
+_SQL_INSERT_GUESS: str = """
+    INSERT INTO guesses (session_id, guessed_emotion, score)
+    VALUES (?, ?, ?)
+"""
+
+_SQL_GET_GUESSES: str = """
+    SELECT id, session_id, guessed_emotion, score, created_at
+    FROM guesses
+    WHERE session_id = ?
+    ORDER BY created_at DESC
+"""
+
 def create_guess(session_id: int, guessed_emotion: str, score: int) -> Dict[str, Any]:
     """
     Record a decoder's guess for a session.
@@ -207,13 +263,8 @@ def create_guess(session_id: int, guessed_emotion: str, score: int) -> Dict[str,
     
     with db_transaction() as connection:
         cursor = connection.cursor()
-        cursor.execute(
-            """
-            INSERT INTO guesses (session_id, guessed_emotion, score)
-            VALUES (?, ?, ?)
-            """,
-            (session_id, guessed_emotion.lower(), score)
-        )
+        cursor.execute(_SQL_INSERT_GUESS,
+                       (session_id, guessed_emotion.lower(), score))
         guess_id = cursor.lastrowid
     
     return {
@@ -225,79 +276,292 @@ def create_guess(session_id: int, guessed_emotion: str, score: int) -> Dict[str,
     }
 
 
-def get_guesses_for_session(session_id: int) -> List[Dict[str, Any]]:
+def create_guesses(rows: List[Tuple[int, str, int]]) -> int:
     """
-    Retrieve all guesses for a specific session.
-    
+    Record many guesses in a single transaction.
+
+    Bulk callers (round-end submission, replay imports) would otherwise
+    pay one transaction commit per row; executemany reuses the prepared
+    statement and commits once.
+
     Args:
-        session_id: The ID of the session.
-    
+        rows: (session_id, guessed_emotion, score) tuples.
+
     Returns:
-        List of dictionaries containing guess details.
+        The number of guesses inserted.
+
+    Raises:
+        ValueError: If any score is not between 0 and 100.
+        sqlite3.Error: If a referenced session doesn't exist.
+    """
+    if not rows:
+        return 0
+
+    if any(not 0 <= score <= 100 for _, _, score in rows):
+        raise ValueError("Score must be between 0 and 100")
+
+    prepared = [(session_id, guessed_emotion.lower(), score)
+                for session_id, guessed_emotion, score in rows]
+
+    with db_transaction() as connection:
+        cursor = connection.cursor()
+        cursor.executemany(_SQL_INSERT_GUESS, prepared)
+        return cursor.rowcount
+
+
+def iter_guesses(session_id: int):
+    """
+    Iterate over guesses for a session without materializing them all.
+
+    Rows stream off the cursor one at a time, so consumers that emit or
+    aggregate incrementally hold one row dict at peak instead of the
+    whole result set. The connection is held until the generator is
+    exhausted or closed.
+
+    Args:
+        session_id: The ID of the session.
+
+    Yields:
+        Dictionaries containing guess details, newest first.
     """
     connection = get_db_connection()
     try:
         cursor = connection.cursor()
-        cursor.execute(
-            """
-            SELECT id, session_id, guessed_emotion, score, created_at
-            FROM guesses
-            WHERE session_id = ?
-            ORDER BY created_at DESC
-            """,
-            (session_id,)
-        )
-        rows = cursor.fetchall()
-        
-        return [
-            {
-                'id': row['id'],
-                'session_id': row['session_id'],
-                'guessed_emotion': row['guessed_emotion'],
-                'score': row['score'],
-                'created_at': row['created_at']
-            }
-            for row in rows
-        ]
+        cursor.execute(_SQL_GET_GUESSES, (session_id,))
+        # dict(sqlite3.Row) converts at C level - no per-field Python
+        # lookups, and the SELECT already names exactly the keys we expose
+        for row in cursor:
+            yield dict(row)
     finally:
         close_db_connection(connection)
 
 
+def get_guesses_for_session(session_id: int) -> List[Dict[str, Any]]:
+    """
+    Retrieve all guesses for a specific session.
+
+    Args:
+        session_id: The ID of the session.
+
+    Returns:
+        List of dictionaries containing guess details.
+    """
+    return list(iter_guesses(session_id))
+
+
 # =============================================================================
 # Video Call Operations (Feature 3: Video Call)
 # =============================================================================
 
-def create_video_call() -> Dict[str, Any]:
+# Compiled once at import. Malformed codes (bad length, missing hyphen,
+# stray characters) are rejected here before a connection is ever checked
+# out, so junk lookups cost a regex match instead of a database round trip.
+_ROOM_CODE_RE = re.compile(r'^[A-Z0-9]{4}-[A-Z0-9]{4}$')
+
+
+def _normalize_room_code(room_code: Optional[str]) -> Optional[str]:
     """
-    Create a new video call room.
-    
+    Uppercase and validate a room code.
+
+    Args:
+        room_code: Raw room code as received from the client.
+
     Returns:
-        Dictionary containing the room details including room code.
+        The canonical uppercase code, or None if it can't be a valid code.
     """
-    room_code = generate_room_code()
-    
+    if not room_code:
+        return None
+    code = room_code.upper()
+    return code if _ROOM_CODE_RE.match(code) else None
+
+
+_SQL_INSERT_CALL: str = """
+    INSERT INTO video_calls (room_code, mood_timeline)
+    VALUES (?, '[]')
+"""
+
+_SQL_GET_CALL: str = """
+    SELECT id, room_code, mood_timeline, start_time, end_time
+    FROM video_calls
+    WHERE room_code = ?
+"""
+
+_SQL_GET_CALL_ID: str = """
+    SELECT id FROM video_calls WHERE room_code = ?
+"""
+
+_SQL_INSERT_MOOD_EVENT: str = """
+    INSERT INTO mood_events (call_id, user_id, emotion, timestamp)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_GET_MOOD_EVENTS: str = """
+    SELECT user_id, emotion, timestamp
+    FROM mood_events
+    WHERE call_id = ?
+    ORDER BY id
+"""
+
+
+def _now_ms() -> int:
+    """Current wall-clock time as epoch milliseconds."""
+    return time.time_ns() // 1_000_000
+
+
+def _ms_to_iso(value: Any) -> str:
+    """
+    Convert a stored mood-event timestamp to an ISO-8601 string.
+
+    Events are stored as epoch-millisecond integers (smaller and sortable
+    without string comparison); rows written before that change carry ISO
+    strings and pass through unchanged.
+
+    Args:
+        value: Epoch milliseconds, or a legacy ISO string.
+
+    Returns:
+        An ISO-8601 timestamp string.
+    """
+    if isinstance(value, str):
+        return value
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc) \
+        .isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+_SQL_LAST_MOOD_EVENT_ID: str = """
+    SELECT MAX(id) FROM mood_events WHERE call_id = ?
+"""
+
+# Process-local cache of reconstructed timelines keyed by room code.
+# Call UIs poll the same room every second; the cheap MAX(id) probe tells
+# us whether anything changed, and the write path appends in place so a
+# poll after an update still skips the full event refetch. Entries are
+# (last event id, timeline list).
+_timeline_cache: Dict[str, tuple] = {}
+
+# Write-behind queue for mood events. Mood ticks arrive in streams from
+# every participant, so instead of one transaction (and one WAL commit)
+# per tick, events are buffered and a background thread flushes them in
+# a single executemany batch every _MOOD_FLUSH_INTERVAL seconds. Clients
+# never need a durability ack for mood telemetry. Items are
+# (room_code, call_id, user_id, emotion, timestamp).
+_mood_queue: "queue.Queue[tuple]" = queue.Queue()
+_MOOD_FLUSH_INTERVAL: float = 0.05
+
+# Room code -> call id. A call's id never changes and calls are never
+# deleted, so after the first mood tick resolves it, later ticks for the
+# same room skip the lookup query entirely.
+_call_id_cache: Dict[str, int] = {}
+
+# Rooms with events still in the queue; while a room has pending events
+# its cached timeline is ahead of the database and must win over the
+# MAX(id) freshness probe. Guarded by _mood_lock.
+_mood_pending: Dict[str, int] = {}
+_mood_lock = threading.Lock()
+_mood_flusher_started = False
+
+
+def _flush_mood_batch(batch: List[tuple]) -> None:
+    """
+    Insert a batch of queued mood events in one transaction.
+
+    Args:
+        batch: Queue items collected since the last flush.
+    """
+    rows = [(call_id, user_id, emotion, timestamp)
+            for _, call_id, user_id, emotion, timestamp in batch]
     with db_transaction() as connection:
         cursor = connection.cursor()
-        
-        # Ensure unique room code
-        max_retries = 5
-        for attempt in range(max_retries):
+        cursor.executemany(_SQL_INSERT_MOOD_EVENT, rows)
+
+        # Resync cached timeline versions now that the rows are visible,
+        # so the next poll's MAX(id) probe matches without a refetch
+        with _mood_lock:
+            for room_code, call_id, *_ in batch:
+                count = _mood_pending.get(room_code, 0) - 1
+                if count > 0:
+                    _mood_pending[room_code] = count
+                    continue
+                _mood_pending.pop(room_code, None)
+
+                cached = _timeline_cache.get(room_code)
+                if cached is not None:
+                    cursor.execute(_SQL_LAST_MOOD_EVENT_ID, (call_id,))
+                    _timeline_cache[room_code] = (cursor.fetchone()[0],
+                                                  cached[1])
+
+
+def _mood_flusher() -> None:
+    """Drain the mood-event queue in batches forever (daemon thread)."""
+    while True:
+        batch = [_mood_queue.get()]
+        # Give stragglers one flush interval to join the batch
+        time.sleep(_MOOD_FLUSH_INTERVAL)
+        while True:
             try:
-                cursor.execute(
-                    """
-                    INSERT INTO video_calls (room_code, mood_timeline)
-                    VALUES (?, '[]')
-                    """,
-                    (room_code,)
-                )
+                batch.append(_mood_queue.get_nowait())
+            except queue.Empty:
                 break
-            except sqlite3.IntegrityError:
-                if attempt < max_retries - 1:
-                    room_code = generate_room_code()
-                else:
-                    raise sqlite3.Error("Failed to generate unique room code")
-        
-        call_id = cursor.lastrowid
+        try:
+            _flush_mood_batch(batch)
+        except sqlite3.Error:
+            pass  # Mood telemetry is best-effort; drop the batch
+
+
+def _ensure_mood_flusher() -> None:
+    """Start the background flusher thread on first use."""
+    global _mood_flusher_started
+    if not _mood_flusher_started:
+        with _mood_lock:
+            if not _mood_flusher_started:
+                thread = threading.Thread(target=_mood_flusher,
+                                          name='mood-flusher', daemon=True)
+                thread.start()
+                _mood_flusher_started = True
+
+
+@atexit.register
+def _drain_mood_queue() -> None:
+    """Flush any still-queued mood events before the process exits."""
+    batch = []
+    while True:
+        try:
+            batch.append(_mood_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        try:
+            _flush_mood_batch(batch)
+        except sqlite3.Error:
+            pass
+
+_SQL_END_CALL: str = """
+    UPDATE video_calls
+    SET end_time = ?
+    WHERE room_code = ? AND end_time IS NULL
+    RETURNING id, room_code, start_time, end_time
+"""
+
+def create_video_call() -> Dict[str, Any]:
+    """
+    Create a new video call room.
+    
+    Returns:
+        Dictionary containing the room details including room code.
+    """
+    # One retry on collision, mirroring create_session: the probe and
+    # insert aren't atomic across workers
+    for attempt in range(2):
+        room_code = _find_unused_code('video_calls', 'room_code',
+                                      generate_room_code)
+        try:
+            with db_transaction() as connection:
+                cursor = connection.cursor()
+                cursor.execute(_SQL_INSERT_CALL, (room_code,))
+                call_id = cursor.lastrowid
+            break
+        except sqlite3.IntegrityError:
+            if attempt:
+                raise
     
     return {
         'id': call_id,
@@ -318,27 +582,51 @@ def get_video_call_by_room(room_code: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary containing call details, or None if not found.
     """
-    if not room_code:
+    code = _normalize_room_code(room_code)
+    if code is None:
         return None
-    
+
     connection = get_db_connection()
     try:
         cursor = connection.cursor()
-        cursor.execute(
-            """
-            SELECT id, room_code, mood_timeline, start_time, end_time
-            FROM video_calls
-            WHERE room_code = ?
-            """,
-            (room_code.upper(),)
-        )
+        cursor.execute(_SQL_GET_CALL, (code,))
         row = cursor.fetchone()
-        
+
         if row:
+            cursor.execute(_SQL_LAST_MOOD_EVENT_ID, (row['id'],))
+            last_id = cursor.fetchone()[0]
+
+            # While events for this room are still queued, the cached
+            # timeline is ahead of the database and must win over the
+            # MAX(id) probe
+            with _mood_lock:
+                pending = _mood_pending.get(code, 0)
+            cached = _timeline_cache.get(code)
+            if cached is not None and (pending or cached[0] == last_id):
+                timeline = cached[1]
+            else:
+                # Legacy rows may still carry a JSON timeline from before
+                # the mood_events table; newer updates live in mood_events
+                timeline = orjson.loads(row['mood_timeline'] or '[]')
+                cursor.execute(_SQL_GET_MOOD_EVENTS, (row['id'],))
+                timeline.extend(
+                    {
+                        'user': event['user_id'],
+                        'emotion': event['emotion'],
+                        'timestamp': _ms_to_iso(event['timestamp'])
+                    }
+                    for event in cursor.fetchall()
+                )
+                # Don't cache a rebuild that raced queued events; it
+                # would be missing them when the flusher resyncs
+                if not pending:
+                    _timeline_cache[code] = (last_id, timeline)
+
+            # Shallow-copy so callers can't mutate the cached list
             return {
                 'id': row['id'],
                 'room_code': row['room_code'],
-                'mood_timeline': json.loads(row['mood_timeline'] or '[]'),
+                'mood_timeline': list(timeline),
                 'start_time': row['start_time'],
                 'end_time': row['end_time']
             }
@@ -350,7 +638,11 @@ def get_video_call_by_room(room_code: str) -> Optional[Dict[str, Any]]:
 def update_video_call_mood(room_code: str, user_id: str, emotion: str) -> Dict[str, Any]:
     """
     Add a mood update to a video call's timeline.
-    
+
+    The database insert is deferred to a background batch writer; the
+    returned dict describes the queued event. Durability is best-effort,
+    matching what mood telemetry needs.
+
     Args:
         room_code: The room code of the call.
         user_id: Identifier for the user updating their mood.
@@ -358,34 +650,49 @@ def update_video_call_mood(room_code: str, user_id: str, emotion: str) -> Dict[s
     
     Returns:
         Dictionary containing the mood update details.
-    
+
     Raises:
-        ValueError: If the room doesn't exist.
+        ValueError: If the room doesn't exist or the code is malformed.
     """
-    call = get_video_call_by_room(room_code)
-    if not call:
-        raise ValueError(f"Video call room '{room_code}' not found")
-    
+    code = _normalize_room_code(room_code)
+    if code is None:
+        raise ValueError(f"Invalid video call room code '{room_code}'")
+
+    now_ms = _now_ms()
     mood_update = {
         'user': user_id,
         'emotion': emotion.lower(),
-        'timestamp': datetime.now().isoformat()
+        'timestamp': _ms_to_iso(now_ms)
     }
-    
-    timeline = call['mood_timeline']
-    timeline.append(mood_update)
-    
-    with db_transaction() as connection:
-        cursor = connection.cursor()
-        cursor.execute(
-            """
-            UPDATE video_calls
-            SET mood_timeline = ?
-            WHERE room_code = ?
-            """,
-            (json.dumps(timeline), room_code.upper())
-        )
-    
+
+    # Only the existence check runs synchronously (and only on the first
+    # tick for a room - the call id is immutable, so it is cached after
+    # that); the row insert itself is handed to the batch writer, so a
+    # mood tick never waits on a WAL commit
+    call_id = _call_id_cache.get(code)
+    if call_id is None:
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(_SQL_GET_CALL_ID, (code,))
+            row = cursor.fetchone()
+        finally:
+            close_db_connection(connection)
+
+        if row is None:
+            raise ValueError(f"Video call room '{room_code}' not found")
+        call_id = _call_id_cache[code] = row['id']
+
+    _ensure_mood_flusher()
+    with _mood_lock:
+        _mood_pending[code] = _mood_pending.get(code, 0) + 1
+        # Keep the cached timeline current so the next poll reuses it
+        cached = _timeline_cache.get(code)
+        if cached is not None:
+            cached[1].append(mood_update)
+    _mood_queue.put((code, call_id, user_id, mood_update['emotion'],
+                     now_ms))
+
     return mood_update
 
 
@@ -395,19 +702,37 @@ def end_video_call(room_code: str) -> Optional[Dict[str, Any]]:
     
     Args:
         room_code: The room code of the call to end.
-    
+
     Returns:
-        Dictionary containing the final call details, or None if not found.
+        Dictionary containing the final call details (without the mood
+        timeline - use get_video_call_by_room for that), or None if not
+        found.
     """
+    code = _normalize_room_code(room_code)
+    if code is None:
+        return None
+
+    # RETURNING folds the existence check and result fetch into the UPDATE
+    # itself, one query instead of two on the common path
     with db_transaction() as connection:
         cursor = connection.cursor()
-        cursor.execute(
-            """
-            UPDATE video_calls
-            SET end_time = ?
-            WHERE room_code = ? AND end_time IS NULL
-            """,
-            (datetime.now().isoformat(), room_code.upper())
-        )
-    
+        cursor.execute(_SQL_END_CALL, (datetime.now().isoformat(), code))
+        row = cursor.fetchone()
+
+    # A call ends exactly once; drop its cache entries so the timeline
+    # and call-id caches don't grow by one room forever
+    with _mood_lock:
+        _timeline_cache.pop(code, None)
+        _call_id_cache.pop(code, None)
+
+    if row:
+        return {
+            'id': row['id'],
+            'room_code': row['room_code'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time']
+        }
+
+    # No row updated: either the room doesn't exist or the call already
+    # ended - fall back to a plain lookup to tell the two apart
     return get_video_call_by_room(room_code)
@@ -5,20 +5,27 @@ Handles HTTP routes for game creation and page rendering.
 """
 
 from flask import Blueprint, render_template, request, jsonify
-import random
-import string
+import os
 
 
 # Create blueprint
 game_bp = Blueprint('game', __name__, url_prefix='/game')
 
 
+# Hoisted once: rebuilding the alphabet per call and sampling it one
+# character at a time with random.choices was pure-Python overhead, and
+# codes drawn from the Mersenne Twister are guessable. The 32-character
+# alphabet (no I, O, 0, 1 - same as models.session) maps exactly onto
+# 5 bits, so masking each random byte with 31 picks uniformly, with no
+# modulo bias.
+_ALPHABET: bytes = b'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
+
 def generate_room_code() -> str:
     """Generate a unique room code in format XXXX-XXXX."""
-    chars = string.ascii_uppercase + string.digits
-    part1 = ''.join(random.choices(chars, k=4))
-    part2 = ''.join(random.choices(chars, k=4))
-    return f"{part1}-{part2}"
+    raw = os.urandom(8)
+    body = bytes(_ALPHABET[b & 31] for b in raw)
+    return f"{body[:4].decode('ascii')}-{body[4:].decode('ascii')}"
 
 
 @game_bp.route('/')
@@ -7,9 +7,12 @@ Handles game state, scoring, turns, and game flow.
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
+from operator import itemgetter
 import random
+import time
 
-from services.word_bank import get_words_for_selection, check_guess, get_hint
+from services.word_bank import (get_words_for_selection, check_guess,
+                                get_hint, normalize_word)
 
 
 # Points configuration
@@ -21,10 +24,15 @@ ROUND_TIME_SECONDS = 60     # Time per round
 
 @dataclass
 class Player:
-    """Represents a player in the game."""
+    """
+    Represents a player in the game.
+
+    Scores live in GameState.scores rather than here: the leaderboard
+    sorts and serializes scores on every state rebuild, and a flat
+    user_id -> score dict keeps that a single-column operation.
+    """
     user_id: str
     username: str
-    score: int = 0
     is_ready: bool = False
     has_guessed_correctly: bool = False
 
@@ -37,12 +45,27 @@ class GameRound:
     word: str
     category: str
     difficulty: str
+    # normalize_word(word), computed once at round start so each guess
+    # pays for normalizing the guess only
+    word_normalized: str = ""
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    # Monotonic clock reading at round start; elapsed-time math uses this
+    # instead of wall-clock datetimes, so it is one cheap clock read and
+    # immune to system clock adjustments
+    start_monotonic: Optional[float] = None
     guesses: List[Dict[str, Any]] = field(default_factory=list)
     correct_guessers: List[str] = field(default_factory=list)
     hints_used: int = 0
 
+    @property
+    def time_remaining(self) -> int:
+        """Seconds left in this round, clamped at zero."""
+        if self.start_monotonic is None:
+            return ROUND_TIME_SECONDS
+        elapsed = int(time.monotonic() - self.start_monotonic)
+        return max(0, ROUND_TIME_SECONDS - elapsed)
+
 
 class GameState:
     """
@@ -52,9 +75,17 @@ class GameState:
     def __init__(self, room_code: str):
         self.room_code = room_code
         self.players: Dict[str, Player] = {}
+        # Canonical score store; see the Player docstring
+        self.scores: Dict[str, int] = {}
         self.player_order: List[str] = []
+        # user_id -> position in player_order, kept in lockstep so
+        # removal is a swap-with-last pop instead of an O(N) list.remove
+        self.player_index: Dict[str, int] = {}
         self.current_round: Optional[GameRound] = None
         self.round_history: List[GameRound] = []
+        # Results-view summaries, one per finished round, built at
+        # end_round while the actor is still in the room
+        self._round_summaries: List[Dict[str, Any]] = []
         self.total_rounds: int = 0
         self.max_rounds: int = 0  # Will be set based on player count
         self.game_started: bool = False
@@ -62,34 +93,63 @@ class GameState:
         self.current_actor_index: int = 0
         self.difficulty: str = "easy"
         self.created_at: datetime = datetime.now()
-    
+        # Mutation version counters: every state-changing method bumps
+        # _version (and _scores_version when scores or the roster change),
+        # and the serialized state / sorted leaderboard are cached against
+        # the version they were built at. Handlers call these several
+        # times per event, so only the first call after a change rebuilds.
+        self._version: int = 0
+        self._cached_state: Optional[Dict[str, Any]] = None
+        self._cached_state_version: int = -1
+        self._scores_version: int = 0
+        self._cached_leaderboard: Optional[List[Dict[str, Any]]] = None
+        self._cached_leaderboard_version: int = -1
+
     def add_player(self, user_id: str, username: str) -> bool:
         """Add a player to the game."""
         if user_id in self.players:
             return False
-        
+
         self.players[user_id] = Player(user_id=user_id, username=username)
+        self.scores[user_id] = 0
+        self.player_index[user_id] = len(self.player_order)
         self.player_order.append(user_id)
+        self._version += 1
+        self._scores_version += 1
         return True
-    
+
     def remove_player(self, user_id: str) -> bool:
         """Remove a player from the game."""
         if user_id not in self.players:
             return False
-        
+
         del self.players[user_id]
-        self.player_order.remove(user_id)
-        
+        self.scores.pop(user_id, None)
+
+        # Swap-with-last pop: O(1) regardless of position. Turn order of
+        # the swapped player changes, which is fine - order is shuffled
+        # at game start anyway.
+        idx = self.player_index.pop(user_id)
+        last = self.player_order.pop()
+        if idx < len(self.player_order):
+            self.player_order[idx] = last
+            self.player_index[last] = idx
+
         # Adjust actor index if needed
-        if self.current_actor_index >= len(self.player_order):
+        if self.player_order:
+            self.current_actor_index %= len(self.player_order)
+        else:
             self.current_actor_index = 0
-        
+
+        self._version += 1
+        self._scores_version += 1
         return True
-    
+
     def set_player_ready(self, user_id: str, ready: bool = True) -> None:
         """Set a player's ready status."""
         if user_id in self.players:
             self.players[user_id].is_ready = ready
+            self._version += 1
     
     def all_players_ready(self) -> bool:
         """Check if all players are ready."""
@@ -109,9 +169,14 @@ class GameState:
         self.total_rounds = 0
         self.current_actor_index = 0
         
-        # Shuffle player order
+        # Shuffle player order and rebuild the position map to match.
+        # random.shuffle is O(N) Python-level swaps, but this runs once
+        # per game over at most a room's worth of players - not worth a
+        # vectorized alternative unless rooms grow by orders of magnitude.
         random.shuffle(self.player_order)
-        
+        self.player_index = {uid: i for i, uid in enumerate(self.player_order)}
+
+        self._version += 1
         return True
     
     def get_current_actor(self) -> Optional[str]:
@@ -139,11 +204,14 @@ class GameState:
             round_number=self.total_rounds,
             actor_id=actor_id,
             word=word_choice["word"],
+            word_normalized=normalize_word(word_choice["word"]),
             category=word_choice["category"],
             difficulty=word_choice.get("difficulty", self.difficulty),
-            start_time=datetime.now()
+            start_time=datetime.now(),
+            start_monotonic=time.monotonic()
         )
-        
+
+        self._version += 1
         return self.current_round
     
     def submit_guess(self, user_id: str, guess: str) -> Dict[str, Any]:
@@ -162,41 +230,51 @@ class GameState:
             return {"correct": False, "points": 0, "message": "Player not in game"}
         
         player = self.players[user_id]
-        
-        if player.has_guessed_correctly:
+
+        # Check correct_guessers too: leaving and rejoining mid-round
+        # resets has_guessed_correctly, and a second correct guess would
+        # double-count the player in the round's all-guessed test
+        if (player.has_guessed_correctly
+                or user_id in self.current_round.correct_guessers):
             return {"correct": False, "points": 0, "message": "Already guessed correctly"}
         
+        # One clock read covers both the guess record and the scoring
+        # math below; the recorded timestamp is seconds into the round
+        elapsed = time.monotonic() - self.current_round.start_monotonic
+
         # Record the guess
         self.current_round.guesses.append({
             "user_id": user_id,
             "username": player.username,
             "guess": guess,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": round(elapsed, 3)
         })
-        
+
         # Check if correct
-        is_correct = check_guess(guess, self.current_round.word)
-        
+        is_correct = check_guess(guess, self.current_round.word,
+                                 self.current_round.word_normalized)
+
         if is_correct:
             player.has_guessed_correctly = True
             self.current_round.correct_guessers.append(user_id)
-            
+
             # Calculate points
-            time_elapsed = (datetime.now() - self.current_round.start_time).seconds
-            time_remaining = max(0, ROUND_TIME_SECONDS - time_elapsed)
+            time_remaining = max(0, ROUND_TIME_SECONDS - int(elapsed))
             
             # More points for earlier guesses
             position_bonus = (len(self.players) - len(self.current_round.correct_guessers)) * 20
             time_bonus = time_remaining * POINTS_TIME_BONUS // 10
             
             total_points = POINTS_CORRECT_GUESS + position_bonus + time_bonus
-            player.score += total_points
-            
+            self.scores[user_id] += total_points
+
             # Give actor bonus points
-            actor = self.players.get(self.current_round.actor_id)
-            if actor:
-                actor.score += POINTS_ACTOR_BONUS
-            
+            actor_id = self.current_round.actor_id
+            if actor_id in self.scores:
+                self.scores[actor_id] += POINTS_ACTOR_BONUS
+
+            self._version += 1
+            self._scores_version += 1
             return {
                 "correct": True,
                 "points": total_points,
@@ -221,16 +299,28 @@ class GameState:
             "correct_guessers": self.current_round.correct_guessers,
             "total_guesses": len(self.current_round.guesses)
         }
-        
+
+        # Build the final-results entry now, while the actor can still be
+        # resolved to a username; get_final_results just replays the list
+        actor = self.players.get(self.current_round.actor_id)
+        self._round_summaries.append({
+            "round": self.current_round.round_number,
+            "word": self.current_round.word,
+            "actor": actor.username if actor else "Unknown",
+            "guessed_by": len(self.current_round.correct_guessers)
+        })
+
+
         # Move to next actor
         self.current_actor_index = (self.current_actor_index + 1) % len(self.player_order)
         
         # Check if game should end
         if self.total_rounds >= self.max_rounds:
             self.game_ended = True
-        
+
         self.current_round = None
-        
+
+        self._version += 1
         return round_summary
     
     def use_hint(self, hint_number: int = None) -> Optional[str]:
@@ -254,30 +344,46 @@ class GameState:
     
     def get_leaderboard(self) -> List[Dict[str, Any]]:
         """Get the current leaderboard."""
-        sorted_players = sorted(
-            self.players.values(),
-            key=lambda p: p.score,
-            reverse=True
-        )
-        
-        return [
+        if self._cached_leaderboard_version == self._scores_version:
+            return self._cached_leaderboard
+
+        # Sorting the flat score dict touches only the sort key column;
+        # usernames are joined in afterwards
+        ranked = sorted(self.scores.items(), key=itemgetter(1), reverse=True)
+
+        self._cached_leaderboard = [
             {
                 "rank": i + 1,
-                "user_id": p.user_id,
-                "username": p.username,
-                "score": p.score
+                "user_id": user_id,
+                "username": self.players[user_id].username,
+                "score": score
             }
-            for i, p in enumerate(sorted_players)
+            for i, (user_id, score) in enumerate(ranked)
         ]
+        self._cached_leaderboard_version = self._scores_version
+        return self._cached_leaderboard
     
     def get_game_state(self) -> Dict[str, Any]:
-        """Get the full game state for synchronization."""
+        """
+        Get the full game state for synchronization.
+
+        The payload is cached against the mutation version counter, so
+        only the first call after a change pays for rebuilding the dict
+        and sorting the leaderboard.
+        """
+        if self._cached_state_version == self._version:
+            # Only the countdown changes between mutations; refresh it in place
+            if self.current_round and "round_info" in self._cached_state:
+                self._cached_state["round_info"]["time_remaining"] = \
+                    self.current_round.time_remaining
+            return self._cached_state
+
         state = {
             "room_code": self.room_code,
             "players": {
                 uid: {
                     "username": p.username,
-                    "score": p.score,
+                    "score": self.scores[uid],
                     "is_ready": p.is_ready
                 }
                 for uid, p in self.players.items()
@@ -300,26 +406,20 @@ class GameState:
                 "actor_id": self.current_round.actor_id,
                 "time_remaining": self.current_round.time_remaining
             }
-        
+
+        self._cached_state = state
+        self._cached_state_version = self._version
         return state
     
     def get_final_results(self) -> Dict[str, Any]:
         """Get final game results."""
         leaderboard = self.get_leaderboard()
-        
+
         return {
             "winner": leaderboard[0] if leaderboard else None,
             "leaderboard": leaderboard,
             "total_rounds": self.total_rounds,
-            "round_history": [
-                {
-                    "round": r.round_number,
-                    "word": r.word,
-                    "actor": self.players.get(r.actor_id, {}).username if r.actor_id in self.players else "Unknown",
-                    "guessed_by": len(r.correct_guessers)
-                }
-                for r in self.round_history
-            ]
+            "round_history": self._round_summaries
         }
 
 
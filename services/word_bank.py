@@ -5,7 +5,7 @@ Contains categories of words suitable for sign language guessing.
 Words are selected to be easy to demonstrate with hand gestures/signs.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import random
 
 # Word categories with difficulty levels
@@ -69,28 +69,45 @@ WORD_BANK: Dict[str, Dict[str, List[str]]] = {
 }
 
 
+# Flattened per-difficulty pools, built once at import. Selection becomes a
+# tuple lookup plus random indexing instead of rebuilding category lists and
+# retrying on duplicates for every round.
+_WORDS_BY_DIFF: Dict[str, tuple] = {
+    difficulty: tuple(
+        {"word": word, "category": category, "difficulty": difficulty}
+        for category, words in categories.items()
+        for word in words
+    )
+    for difficulty, categories in WORD_BANK.items()
+}
+
+# Category name lists, also built once: WORD_BANK never changes after
+# import, so there is no reason to re-list dict keys per call
+_CATS_BY_DIFF: Dict[str, List[str]] = {
+    difficulty: list(categories.keys())
+    for difficulty, categories in WORD_BANK.items()
+}
+_ALL_CATS: List[str] = sorted(
+    {category for cats in _CATS_BY_DIFF.values() for category in cats}
+)
+
+
 def get_random_word(difficulty: str = "easy") -> Dict[str, str]:
     """
     Get a random word from the word bank.
-    
+
     Args:
         difficulty: 'easy', 'medium', or 'hard'
-    
+
     Returns:
         Dictionary with 'word' and 'category' keys
     """
-    if difficulty not in WORD_BANK:
+    if difficulty not in _WORDS_BY_DIFF:
         difficulty = "easy"
-    
-    categories = WORD_BANK[difficulty]
-    category = random.choice(list(categories.keys()))
-    word = random.choice(categories[category])
-    
-    return {
-        "word": word,
-        "category": category,
-        "difficulty": difficulty
-    }
+
+    # One choice over the flattened pool; also weights every word equally
+    # instead of favouring words in small categories
+    return random.choice(_WORDS_BY_DIFF[difficulty])
 
 
 def get_words_for_selection(difficulty: str = "easy", count: int = 3) -> List[Dict[str, str]]:
@@ -104,43 +121,70 @@ def get_words_for_selection(difficulty: str = "easy", count: int = 3) -> List[Di
     Returns:
         List of word dictionaries
     """
-    words = []
+    if difficulty not in _WORDS_BY_DIFF:
+        difficulty = "easy"
+
+    pool = _WORDS_BY_DIFF[difficulty]
+    count = min(count, len(pool))
+
+    # A few words appear in more than one category, so oversample slightly
+    # and keep the first occurrence of each word
+    words: List[Dict[str, str]] = []
     used_words = set()
-    
-    while len(words) < count:
-        word_info = get_random_word(difficulty)
+    for word_info in random.sample(pool, min(len(pool), count + 3)):
         if word_info["word"] not in used_words:
             used_words.add(word_info["word"])
             words.append(word_info)
-    
+            if len(words) == count:
+                return words
+
+    # Extremely unlikely top-up if the oversample was all duplicates
+    for word_info in pool:
+        if word_info["word"] not in used_words:
+            used_words.add(word_info["word"])
+            words.append(word_info)
+            if len(words) == count:
+                break
+
     return words
 
 
-def check_guess(guess: str, actual_word: str) -> bool:
+def normalize_word(text: str) -> str:
+    """
+    Normalize a word for guess comparison.
+
+    Lowercases, trims, and strips internal spaces so minor variations
+    (e.g., "ice cream" vs "icecream") compare equal.
+
+    Args:
+        text: The word or guess to normalize
+
+    Returns:
+        The normalized form
+    """
+    return text.lower().strip().replace(" ", "")
+
+
+def check_guess(guess: str, actual_word: str,
+                actual_normalized: Optional[str] = None) -> bool:
     """
     Check if a guess matches the actual word.
-    
-    Case-insensitive comparison with basic normalization.
-    
+
+    Case-insensitive comparison with basic normalization. Callers that
+    score many guesses against the same word can pass its precomputed
+    normalize_word() form to skip re-normalizing it per guess.
+
     Args:
         guess: The player's guess
         actual_word: The word being acted out
-    
+        actual_normalized: Optional cached normalize_word(actual_word)
+
     Returns:
         True if the guess is correct
     """
-    guess_normalized = guess.lower().strip()
-    word_normalized = actual_word.lower().strip()
-    
-    # Exact match
-    if guess_normalized == word_normalized:
-        return True
-    
-    # Handle minor variations (e.g., "ice cream" vs "icecream")
-    if guess_normalized.replace(" ", "") == word_normalized.replace(" ", ""):
-        return True
-    
-    return False
+    if not actual_normalized:
+        actual_normalized = normalize_word(actual_word)
+    return normalize_word(guess) == actual_normalized
 
 
 def get_hint(word: str, hint_level: int = 1) -> str:
@@ -175,11 +219,7 @@ def get_all_categories(difficulty: str = None) -> List[str]:
     Returns:
         List of category names
     """
-    if difficulty and difficulty in WORD_BANK:
-        return list(WORD_BANK[difficulty].keys())
-    
-    all_categories = set()
-    for diff_categories in WORD_BANK.values():
-        all_categories.update(diff_categories.keys())
-    
-    return list(all_categories)
+    if difficulty and difficulty in _CATS_BY_DIFF:
+        return list(_CATS_BY_DIFF[difficulty])
+
+    return list(_ALL_CATS)
@@ -416,8 +416,9 @@ async function handleAnswer(data) {
 
 async function handleIceCandidate(data) {
     if (!data) return;
-    
-    const { candidate, userId: peerId, targetId } = data;
+
+    // Server uses single-letter keys on this high-frequency event
+    const { c: candidate, u: peerId, t: targetId } = data;
     
     // Only process ICE candidates meant for us
     if (targetId && targetId !== gameState.userId) return;
@@ -723,7 +724,8 @@ function handleRoundStarted(data) {
 }
 
 function handleGuessMade(data) {
-    addChatMessage(data.username, data.guess, false);
+    // Server uses single-letter keys on this high-frequency event
+    addChatMessage(data.n, data.g, false);
 }
 
 function handleCorrectGuess(data) {
@@ -765,10 +767,8 @@ function handleRoundEnded(data) {
 function handleNextRound(data) {
     gameState.isActor = data.actorId === gameState.userId;
     updateActorUI(data.actorId);
-    
-    if (gameState.isActor) {
-        handleWordChoices(data);
-    }
+    // Word choices arrive in a separate 'word-choices' event sent only
+    // to the actor's socket
 }
 
 function handleGameOver(data) {
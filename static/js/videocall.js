@@ -118,8 +118,9 @@ function initializeSocketIO() {
     });
     
     socket.on('ice-candidate', async (data) => {
-        console.log('Received ICE candidate from:', data.userId);
-        await handleIceCandidate(data.candidate, data.userId);
+        // Server uses single-letter keys on this high-frequency event
+        console.log('Received ICE candidate from:', data.u);
+        await handleIceCandidate(data.c, data.u);
     });
 }
 
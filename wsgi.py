@@ -0,0 +1,17 @@
+"""
+WSGI entry point for production deployment.
+
+The Werkzeug dev server started by `python app.py` is fine for local play
+but should not face real traffic. Run the app under Gunicorn with eventlet
+workers (matching the SocketIO async mode) instead:
+
+    gunicorn -k eventlet -w 1 --worker-connections 1000 wsgi:app
+
+Use more than one worker only with REDIS_URL set (so SocketIO broadcasts
+cross worker boundaries) and sticky sessions at the load balancer, since
+game state lives in the worker process.
+"""
+
+from app import app, socketio
+
+__all__ = ['app', 'socketio']